@@ -1,29 +1,52 @@
 import json
-import os
 import random
 import asyncio
-from datetime import datetime
+import time
+import logging
+import uvloop
+import numpy as np
 from bridge import Bridge
-from dotenv import load_dotenv
+from config import Config
+
+logger = logging.getLogger(__name__)
 
 class Animation:
-    def __init__(self, bridge: Bridge, animation_file: str):
+    MIN_GROUP_SPEED = 1000
+
+    def __init__(self, bridge: Bridge, config: Config, animation_file: str):
         """
         Initializes the Animation class with a Bridge instance and an animation configuration file.
         :param bridge: The Bridge instance to communicate with the Hue lights.
+        :param config: The application configuration.
         :param animation_file: Path to the JSON file containing animation configurations.
         """
-        load_dotenv()
         self.bridge = bridge
-        self.lights = os.getenv('LIGHTS').split('|')
-        self.minimum_duration = int(os.getenv('MIN_DURATION', 20))
-        self.maximum_duration = int(os.getenv('MAX_DURATION', 200))
+        self.light_ids = config.lights
+        self.group_id = config.group_id
+        self.bridge.prepare_lights(self.light_ids)
+        self.rng = np.random.default_rng()
+        self._random = random.Random()
+        self._randint = self._random.randint
+        self._choice = self._random.choice
+        self.minimum_duration = config.min_duration
+        self.maximum_duration = config.max_duration
+        self._debug = config.debug
+        self.min_delta = config.min_delta
+        self._last_state = {}
+        self.max_inflight = config.max_inflight
+        self._inflight = asyncio.Semaphore(self.max_inflight)
+        self._senders = {}
+        self._queued = {}
 
         self.animations = self.load_and_validate_animations(animation_file)
+        self.animation_table = self.build_animation_table(self.animations)
 
     def load_and_validate_animations(self, animation_file: str) -> dict:
         """
         Loads and validates the animation JSON configuration file.
+        Each animation needs 'speed', 'hue', 'bri' and 'sat' objects with integer 'min' and 'max' values.
+        An animation may also set "group": true to send one state per frame to the HUE_GROUP light group
+        instead of one per light; when HUE_GROUP is set, its 'speed' 'min' must be at least MIN_GROUP_SPEED ms.
         :param animation_file: Path to the JSON file.
         :return: Parsed and validated JSON data as a dictionary.
         """
@@ -36,6 +59,7 @@ class Animation:
             raise Exception(f"Invalid JSON in {animation_file}: {str(e)}")
 
         required_keys = ['speed', 'hue', 'bri', 'sat']
+        value_ranges = {'hue': (0, 65535), 'bri': (0, 254), 'sat': (0, 254)}
         for animation_name, properties in data.items():
             for key in required_keys:
                 if key not in properties:
@@ -50,64 +74,207 @@ class Animation:
                 if properties[key]['min'] > properties[key]['max']:
                     raise Exception(f"'min' must be less than 'max' for '{key}' in animation '{animation_name}'.")
 
+                if key in value_ranges:
+                    lowest, highest = value_ranges[key]
+                    if properties[key]['min'] < lowest or properties[key]['max'] > highest:
+                        raise Exception(f"'{key}' in animation '{animation_name}' must be within {lowest} to {highest}.")
+
+            if not isinstance(properties.get('group', False), bool):
+                raise Exception(f"'group' in animation '{animation_name}' must be a boolean.")
+
+            # The bridge throttles group commands beyond roughly one per second; without HUE_GROUP
+            # group animations are sent per light, so the limit does not apply
+            if (self.group_id is not None and properties.get('group', False)
+                    and properties['speed']['min'] < self.MIN_GROUP_SPEED):
+                raise Exception(f"'speed' 'min' for group animation '{animation_name}' must be at least "
+                                f"{self.MIN_GROUP_SPEED} ms.")
+
         return data
 
+    def build_animation_table(self, animations: dict) -> list:
+        """
+        Flattens the validated animations into tuples for fast access in the animation loop.
+        :param animations: The validated animation configurations.
+        :return: A list of (name, hue_min, hue_max, bri_min, bri_max, sat_min, sat_max, speed_ms, group) tuples.
+        """
+        return [
+            (
+                name,
+                properties['hue']['min'], properties['hue']['max'],
+                properties['bri']['min'], properties['bri']['max'],
+                properties['sat']['min'], properties['sat']['max'],
+                properties['speed']['min'],
+                properties.get('group', False),
+            )
+            for name, properties in animations.items()
+        ]
+
     async def load_effect(self):
         """
         Loads a random animation effect on the lights defined in the configuration.
+        Group animations send one state per frame to the HUE_GROUP light group instead of one per light.
+        Without HUE_GROUP they fall back to one state per light.
         """
+        light_ids = self.light_ids
+        debug = self._debug
+        min_delta = self.min_delta
+        last_state = self._last_state = {}  # Group and per-light effects invalidate each other's states
+
         # Turn on all lights asynchronously
-        tasks = [self.bridge.turn_on_light(light_id) for light_id in self.lights]
-        await asyncio.gather(*tasks)
+        await self.fan_out(light_ids, (self.bridge.turn_on_light(light_id) for light_id in light_ids))
+
+        _, hue_min, hue_max, bri_min, bri_max, sat_min, sat_max, speed_ms, group = self._choice(self.animation_table)
+        duration = self._randint(self.minimum_duration, self.maximum_duration)
+        interval = speed_ms / 1000
+
+        if group and self.group_id is not None:
+            targets = (self.group_id,)
+            labels = (f"group {self.group_id}",)
+            set_color = self.bridge.set_group_color
+        else:
+            targets = labels = light_ids
+            set_color = self.bridge.set_light_color
+
+        frames = self.generate_random_frames(duration, len(targets), hue_min, hue_max, bri_min, bri_max, sat_min, sat_max)
+        deadline = time.monotonic() + interval
+
+        for frame in frames:
+            for target, label, state in zip(targets, labels, frame):
+                # Skip lights whose state would not visibly change since the last request
+                previous = last_state.get(target)
+                if (previous is not None and state[1] == previous[1] and state[2] == previous[2]
+                        and abs(state[0] - previous[0]) <= min_delta):
+                    continue
+                last_state[target] = state
+                if debug:
+                    self.debug_request(label, state)
+                # Send in the background so the frame rate is not bound by the bridge round-trip
+                await self.dispatch(target, label, state, set_color)
+
+            # Sleep until the next frame is due, accounting for the time spent dispatching
+            now = time.monotonic()
+            if now < deadline:
+                await asyncio.sleep(deadline - now)
+                deadline += interval
+            elif now - deadline > interval:
+                deadline = now + interval  # More than a frame behind, restart the cadence instead of bursting
+            else:
+                deadline += interval
+
+        # Wait for the remaining light color updates to finish
+        await self.drain()
+
+    async def fan_out(self, light_ids: tuple, coros):
+        """
+        Runs one request per light concurrently and logs failures afterwards.
+        A failing light does not cancel the requests for the other lights.
+        :param light_ids: The light IDs, in the same order as the coroutines.
+        :param coros: The coroutines to run, one per light.
+        """
+        results = await asyncio.gather(*coros, return_exceptions=True)
+        for light_id, result in zip(light_ids, results):
+            if isinstance(result, Exception):
+                self.log_error(f"Failed to update light {light_id}: {str(result)}")
 
-        animation_name = random.choice(list(self.animations.keys()))
-        config = self.animations[animation_name]
-        duration = random.randint(self.minimum_duration, self.maximum_duration)
+    async def dispatch(self, target: str, label: str, state: list, set_color):
+        """
+        Schedules a color request for a light in the background.
+        Each light has at most one request in flight; a state dispatched while one is in flight
+        replaces any state still waiting for that light, so the newest state is always sent last.
+        Waits only when MAX_INFLIGHT lights already have a request in flight.
+        :param target: The ID of the light or group the request is for.
+        :param label: The name of the target used in log messages.
+        :param state: The [hue, brightness, saturation] state to send.
+        :param set_color: The bridge method that sends the state.
+        """
+        if target in self._senders:
+            self._queued[target] = state
+            return
+        await self._inflight.acquire()
+        self._senders[target] = asyncio.create_task(self._send(target, label, state, set_color))
 
-        for _ in range(duration):
-            tasks = []
-            for light_id in self.lights:
+    async def _send(self, target: str, label: str, state: list, set_color):
+        """
+        Sends a light's states one at a time until none is waiting, then frees its in-flight slot.
+        :param target: The ID of the light or group the request is for.
+        :param label: The name of the target used in log messages.
+        :param state: The first [hue, brightness, saturation] state to send.
+        :param set_color: The bridge method that sends the state.
+        """
+        try:
+            while state is not None:
                 try:
-                    state = self.generate_random_state(config)
-                    self.debug_request(light_id, state)
-                    # Add set light color to tasks
-                    tasks.append(self.bridge.set_light_color(light_id, state["hue"], state["bri"], state["sat"]))
+                    await set_color(target, *state)
                 except Exception as e:
-                    self.log_error(f"Failed to update light {light_id}: {str(e)}")
-            # Wait for all light color updates to finish
-            await asyncio.gather(*tasks)
-            await asyncio.sleep(config['speed']['min'] / 1000)  # Control the speed of the animation
+                    # Forget the failed state so an equal draw is not skipped as already applied
+                    if self._last_state.get(target) is state:
+                        del self._last_state[target]
+                    self.log_error(f"Failed to update light {label}: {str(e)}")
+                state = self._queued.pop(target, None)
+        finally:
+            del self._senders[target]
+            self._inflight.release()
+
+    async def drain(self):
+        """
+        Waits for all dispatched light requests to finish.
+        """
+        if self._senders:
+            await asyncio.gather(*self._senders.values())
 
-    def generate_random_state(self, config: dict) -> dict:
+    def generate_random_frames(self, duration: int, count: int, hue_min: int, hue_max: int, bri_min: int,
+                               bri_max: int, sat_min: int, sat_max: int) -> list:
         """
-        Generates a random state for a light based on the animation configuration.
-        :param config: The animation configuration dictionary.
-        :return: A dictionary containing random hue, brightness, and saturation values.
+        Generates random states for every light and every frame of an effect in one batch.
+        :param duration: The number of frames.
+        :param count: The number of states per frame.
+        :param hue_min: The minimum hue value.
+        :param hue_max: The maximum hue value.
+        :param bri_min: The minimum brightness value.
+        :param bri_max: The maximum brightness value.
+        :param sat_min: The minimum saturation value.
+        :param sat_max: The maximum saturation value.
+        :return: A list of frames, each a list of [hue, brightness, saturation] states.
         """
-        return {
-            "hue": random.randint(config['hue']['min'], config['hue']['max']),
-            "bri": random.randint(config['bri']['min'], config['bri']['max']),
-            "sat": random.randint(config['sat']['min'], config['sat']['max']),
-        }
+        shape = (duration, count)
+        rng = self.rng
+        return np.stack((
+            rng.integers(hue_min, hue_max, size=shape, endpoint=True),
+            rng.integers(bri_min, bri_max, size=shape, endpoint=True),
+            rng.integers(sat_min, sat_max, size=shape, endpoint=True),
+        ), axis=-1).tolist()
 
     def launch(self):
         """
         Launches an infinite animation loop on the lights.
         """
-        while True:
-            try:
-                asyncio.run(self.load_effect())  # Run the effect asynchronously
-            except Exception as e:
-                self.log_error(f"Animation error: {str(e)}")
-                print(f"An error occurred: {str(e)}")
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())  # Use the libuv-based event loop
+        asyncio.run(self._main())  # Run every effect on a single event loop
+
+    async def _main(self):
+        """
+        Connects to the bridge, warms up its connection pool and loads random effects forever
+        on the running event loop. The bridge's HTTP session is closed when the loop is stopped.
+        """
+        try:
+            await self.bridge.connect()
+            await self.bridge.prewarm()  # Fill the connection pool before the first frame
+            while True:
+                try:
+                    await self.load_effect()
+                except Exception as e:
+                    self.log_error(f"Animation error: {str(e)}")
+                    print(f"An error occurred: {str(e)}")
+        finally:
+            await self.bridge.close()  # Release the shared HTTP session before the event loop closes
 
-    def debug_request(self, light_id: str, state: dict):
+    def debug_request(self, light_id: str, state: list):
         """
         Outputs debug information for a light state request.
         :param light_id: The ID of the light.
-        :param state: The state being set for the light.
+        :param state: The (hue, brightness, saturation) state being set for the light.
         """
-        print(f"Light ID: {light_id} | State: {state}")
+        logger.debug("Light ID: %s | State: %s", light_id, state)
 
     def debug_response(self, light_id: str, response: dict):
         """
@@ -115,13 +282,11 @@ class Animation:
         :param light_id: The ID of the light.
         :param response: The response from the bridge.
         """
-        print(f"Response for Light ID {light_id}: {response}")
+        logger.debug("Response for Light ID %s: %s", light_id, response)
 
     def log_error(self, message: str):
         """
-        Logs an error message to a file.
+        Logs an error message through the module logger.
         :param message: The error message to log.
         """
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        with open('error_log.txt', 'a') as log_file:
-            log_file.write(f"[{timestamp}] {message}\n")
\ No newline at end of file
+        logger.error(message)
\ No newline at end of file
@@ -1,11 +1,94 @@
+import queue
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from dotenv import load_dotenv
+from config import Config
 from bridge import Bridge
 from animation import Animation
 
-# Initialize the Bridge instance
-bridge = Bridge()
+class SecondCachedFormatter(logging.Formatter):
+    """
+    Formatter that reuses the formatted timestamp for records logged within the same second.
+    """
 
-# Initialize the Animation instance with the bridge and animation configuration file
-animation = Animation(bridge, "animation.json")
+    def __init__(self, fmt=None, datefmt=None):
+        """
+        SecondCachedFormatter constructor.
 
-# Launch the animation loop
-animation.launch()
\ No newline at end of file
+        :param fmt: The log record format string.
+        :param datefmt: The strftime format used for timestamps.
+        """
+        super().__init__(fmt, datefmt)
+        self._last_key = None
+        self._last_timestamp = ""
+
+    def formatTime(self, record, datefmt=None):
+        """
+        Formats the record's creation time, reusing the previous result within the same second.
+
+        :param record: The log record being formatted.
+        :param datefmt: The strftime format to use.
+        :return: The formatted timestamp.
+        """
+        key = (int(record.created), datefmt)
+        if key != self._last_key:
+            self._last_timestamp = super().formatTime(record, datefmt)
+            self._last_key = key
+        return self._last_timestamp
+
+# Read the environment once for the whole application
+load_dotenv()
+config = Config.from_env()
+
+# Write each module's errors to its own log file from a background thread
+log_files = {
+    'animation': 'error_log.txt',
+    'bridge': 'bridge_error_log.txt',
+    'http_handler': 'http_error_log.txt',
+}
+formatter = SecondCachedFormatter('[%(asctime)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+handlers = []
+for logger_name, log_file in log_files.items():
+    handler = logging.FileHandler(log_file, delay=True)
+    handler.setLevel(logging.ERROR)
+    handler.setFormatter(formatter)
+    handler.addFilter(logging.Filter(logger_name))
+    handlers.append(handler)
+
+# Send everything the module log files don't record to stderr, like Python's default last-resort handler
+stderr_handler = logging.StreamHandler()
+stderr_handler.setLevel(logging.WARNING)
+stderr_handler.setFormatter(formatter)
+stderr_handler.addFilter(
+    lambda record: record.name.split('.')[0] not in log_files or record.levelno < logging.ERROR
+)
+handlers.append(stderr_handler)
+
+# Print debug output for the animation loop to the console when DEBUG=1
+if config.debug:
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.DEBUG)
+    console_handler.setFormatter(formatter)
+    console_handler.addFilter(logging.Filter('animation'))
+    console_handler.addFilter(lambda record: record.levelno == logging.DEBUG)  # Errors already go to the log files
+    handlers.append(console_handler)
+    logging.getLogger('animation').setLevel(logging.DEBUG)
+
+log_queue = queue.SimpleQueue()
+listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.WARNING)
+root_logger.addHandler(QueueHandler(log_queue))
+listener.start()
+
+try:
+    # Initialize the Bridge instance
+    bridge = Bridge(config)
+
+    # Initialize the Animation instance with the bridge and animation configuration file
+    animation = Animation(bridge, config, "animation.json")
+
+    # Launch the animation loop
+    animation.launch()
+finally:
+    listener.stop()  # Flush any queued log records
\ No newline at end of file
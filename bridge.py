@@ -1,29 +1,94 @@
-import os
 import asyncio
-from dotenv import load_dotenv
-from http_handler import Http
-from datetime import datetime
+import functools
+import logging
+from config import Config
+from http_handler import Http, Http2
+
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=4096)
+def _make_body(hue, brightness, saturation):
+    """
+    Serializes a color state to a JSON request body, caching the most recently used states.
+
+    :param hue: The hue value.
+    :param brightness: The brightness value.
+    :param saturation: The saturation value.
+    :return: The JSON body as bytes.
+    """
+    return b'{"hue":%d,"bri":%d,"sat":%d}' % (hue, brightness, saturation)
 
 class Bridge:
-    def __init__(self):
+    _ON_BODY = b'{"on":true}'
+    _OFF_BODY = b'{"on":false}'
+
+    def __init__(self, config: Config):
         """
         Bridge constructor.
         Initializes the bridge IP, token, and HTTP handler.
+
+        :param config: The application configuration.
+        """
+        self.ip = config.ip
+        self.token = config.token
+        self.http = Http2(config.max_inflight) if config.http2 else Http(config.max_inflight)
+        self._validate = config.validate
+        if config.http2 and config.scheme != 'https':
+            logger.warning("HTTP2=1 has no effect without HUE_SCHEME=https; HTTP/2 is only negotiated over TLS.")
+        base_url = f"{config.scheme}://{self.ip}/api/{self.token}"
+        self.config_url = f"{base_url}/config"
+        self.lights_url = f"{base_url}/lights"
+        self.groups_url = f"{base_url}/groups"
+        self._url_cache: dict[str, str] = {}
+        self._group_url_cache: dict[str, str] = {}
+
+    def prepare_lights(self, light_ids):
+        """
+        Validates the given light IDs once and caches their state URLs.
+
+        :param light_ids: The IDs of the lights that will be controlled.
         """
-        load_dotenv()
-        self.ip = os.getenv('HUE_BRIDGE_LOCAL_IP') if os.getenv('DEV') == 'true' else os.getenv('HUE_BRIDGE_REMOTE_IP')
-        self.token = os.getenv('HUE_TOKEN')
-        self.http = Http()
-        asyncio.run(self.validate_bridge_connection())  # Run the async validation method
+        for light_id in light_ids:
+            self.validate_light_id(light_id)
+            self._url_cache[light_id] = f"{self.lights_url}/{light_id}/state"
+
+    async def connect(self):
+        """
+        Connects to the bridge by validating the connection.
+        Must be awaited on the running event loop before sending light commands.
+        """
+        await self.validate_bridge_connection()
+
+    async def prewarm(self, connections=None):
+        """
+        Opens keep-alive connections to the bridge ahead of time by sending concurrent /config requests.
+        Failures are logged and ignored since the animation can still open connections on demand.
+
+        :param connections: The number of concurrent requests to send. Defaults to the HTTP pool size.
+        """
+        if connections is None:
+            connections = self.http.pool_size
+        results = await asyncio.gather(
+            *(self.http.get(self.config_url) for _ in range(connections)),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                self.log_error(f"Failed to prewarm bridge connection: {str(result)}")
+
+    async def close(self):
+        """
+        Closes the HTTP session used to communicate with the bridge.
+        """
+        await self.http.close()
 
     async def validate_bridge_connection(self):
         """
         Validates the connection to the Philips Hue Bridge.
         Raises an exception if the bridge is unreachable or credentials are invalid.
         """
-        url = f"http://{self.ip}/api/{self.token}/config"
         try:
-            response = await self.http.get(url)  # Await the async HTTP request
+            response = await self.http.get(self.config_url)  # Await the async HTTP request
             if 'name' not in response:
                 self.log_error(f"Invalid response from Hue Bridge: {response}")
                 raise Exception("Unable to connect to the Hue Bridge. Check your IP and token.")
@@ -33,13 +98,30 @@ class Bridge:
 
     def get_url(self, light_id):
         """
-        Generates the API URL for a specific light.
+        Returns the cached API URL for a specific light.
 
         :param light_id: The ID of the light.
         :return: The API URL for the light.
+        :raises: Exception if the light was not prepared with prepare_lights.
         """
-        self.validate_light_id(light_id)
-        return f"http://{self.ip}/api/{self.token}/lights/{light_id}/state"
+        try:
+            return self._url_cache[light_id]
+        except KeyError:
+            self.log_error(f"Unknown light ID: {light_id}")
+            raise Exception(f"Unknown light ID: {light_id}")
+
+    def get_group_url(self, group_id):
+        """
+        Returns the API action URL for a light group, caching it on first use.
+
+        :param group_id: The ID of the group.
+        :return: The API URL for the group action.
+        """
+        url = self._group_url_cache.get(group_id)
+        if url is None:
+            self.validate_light_id(group_id)
+            url = self._group_url_cache[group_id] = f"{self.groups_url}/{group_id}/action"
+        return url
 
     async def turn_on_light(self, light_id):
         """
@@ -50,8 +132,7 @@ class Bridge:
         """
         try:
             url = self.get_url(light_id)
-            data = {"on": True}
-            return await self.http.put(url, data)  # Await the async HTTP request
+            return await self.http.put(url, self._ON_BODY)  # Await the async HTTP request
         except Exception as e:
             self.log_error(f"Failed to turn on light {light_id}: {str(e)}")
             raise e
@@ -65,8 +146,7 @@ class Bridge:
         """
         try:
             url = self.get_url(light_id)
-            data = {"on": False}
-            return await self.http.put(url, data)  # Await the async HTTP request
+            return await self.http.put(url, self._OFF_BODY)  # Await the async HTTP request
         except Exception as e:
             self.log_error(f"Failed to turn off light {light_id}: {str(e)}")
             raise e
@@ -81,19 +161,35 @@ class Bridge:
         :param saturation: The saturation value (0-254).
         :return: The API response as a dictionary.
         """
-        self.validate_color_values(hue, brightness, saturation)
+        if self._validate:
+            self.validate_color_values(hue, brightness, saturation)
         try:
             url = self.get_url(light_id)
-            data = {
-                "hue": hue,
-                "bri": brightness,
-                "sat": saturation
-            }
-            return await self.http.put(url, data)  # Await the async HTTP request
+            return await self.http.put(url, _make_body(hue, brightness, saturation))  # Await the async HTTP request
         except Exception as e:
             self.log_error(f"Failed to set light color for {light_id}: {str(e)}")
             raise e
 
+    async def set_group_color(self, group_id, hue, brightness, saturation):
+        """
+        Sets the color, brightness, and saturation of every light in a group with a single request.
+        The bridge only handles about one group command per second, so keep calls at least that far apart.
+
+        :param group_id: The ID of the group (0 is every light on the bridge).
+        :param hue: The hue value (0-65535).
+        :param brightness: The brightness value (0-254).
+        :param saturation: The saturation value (0-254).
+        :return: The API response as a dictionary.
+        """
+        if self._validate:
+            self.validate_color_values(hue, brightness, saturation)
+        try:
+            url = self.get_group_url(group_id)
+            return await self.http.put(url, _make_body(hue, brightness, saturation))  # Await the async HTTP request
+        except Exception as e:
+            self.log_error(f"Failed to set group color for {group_id}: {str(e)}")
+            raise e
+
     async def get_available_lights(self):
         """
         Retrieves the list of available lights from the bridge.
@@ -101,8 +197,7 @@ class Bridge:
         :return: The list of lights as a dictionary.
         """
         try:
-            url = f"http://{self.ip}/api/{self.token}/lights"
-            return await self.http.get(url)  # Await the async HTTP request
+            return await self.http.get(self.lights_url)  # Await the async HTTP request
         except Exception as e:
             self.log_error(f"Failed to retrieve available lights: {str(e)}")
             raise e
@@ -139,10 +234,8 @@ class Bridge:
 
     def log_error(self, message):
         """
-        Logs an error message to a file.
+        Logs an error message through the module logger.
 
         :param message: The error message to log.
         """
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        with open('bridge_error_log.txt', 'a') as log_file:
-            log_file.write(f"[{timestamp}] {message}\n")
\ No newline at end of file
+        logger.error(message)
\ No newline at end of file
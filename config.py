@@ -0,0 +1,56 @@
+import os
+from dataclasses import dataclass
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    """
+    Settings read once from the environment at startup.
+
+    HUE_BRIDGE_LOCAL_IP / HUE_BRIDGE_REMOTE_IP: The bridge address, local when DEV=true.
+    HUE_TOKEN: The bridge API token.
+    LIGHTS: The light IDs to animate, separated by '|'.
+    HUE_SCHEME: The URL scheme used to reach the bridge (default http).
+    HUE_GROUP: The light group that animations with "group": true are sent to. Unset by default, which
+        sends them per light. Group 0 is every light on the bridge, including lights not in LIGHTS.
+    MIN_DURATION / MAX_DURATION: The range of frames per effect (default 20 to 200).
+    MAX_INFLIGHT: The maximum number of concurrent light requests and HTTP connections (default 16).
+    MIN_DELTA: The hue change below which an otherwise unchanged state is not resent (default 0).
+    VALIDATE: Set to 1 to range-check every color request.
+    DEBUG: Set to 1 to print every light state sent.
+    HTTP2: Set to 1 to use the httpx HTTP/2 client; only effective with HUE_SCHEME=https.
+    """
+    ip: str
+    token: str
+    lights: tuple
+    scheme: str = 'http'
+    group_id: str | None = None
+    min_duration: int = 20
+    max_duration: int = 200
+    max_inflight: int = 16
+    min_delta: int = 0
+    validate: bool = False
+    debug: bool = False
+    http2: bool = False
+
+    @classmethod
+    def from_env(cls):
+        """
+        Builds the configuration from environment variables.
+        Expects the .env file to have been loaded already.
+
+        :return: The Config instance.
+        """
+        return cls(
+            ip=os.getenv('HUE_BRIDGE_LOCAL_IP') if os.getenv('DEV') == 'true' else os.getenv('HUE_BRIDGE_REMOTE_IP'),
+            token=os.getenv('HUE_TOKEN'),
+            scheme=os.getenv('HUE_SCHEME', 'http'),
+            lights=tuple(os.getenv('LIGHTS').split('|')),
+            group_id=os.getenv('HUE_GROUP'),
+            min_duration=int(os.getenv('MIN_DURATION', 20)),
+            max_duration=int(os.getenv('MAX_DURATION', 200)),
+            max_inflight=int(os.getenv('MAX_INFLIGHT', 16)),
+            min_delta=int(os.getenv('MIN_DELTA', 0)),
+            validate=os.getenv('VALIDATE', '0') == '1',
+            debug=os.getenv('DEBUG', '0') == '1',
+            http2=os.getenv('HTTP2', '0') == '1',
+        )
\ No newline at end of file
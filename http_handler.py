@@ -1,11 +1,95 @@
 import aiohttp
 import asyncio
-import json
-from datetime import datetime
+import orjson
+import logging
 
-class Http:
-    def __init__(self, log_file="http_error_log.txt"):
-        self.log_file = log_file
+try:
+    import httpx  # Optional, only needed for Http2
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+class HttpBase:
+    """
+    Validation and logging shared by the HTTP handlers.
+    """
+    _JSON_HDR = {"Content-Type": "application/json"}
+
+    def __init__(self, pool_size=8):
+        """
+        HttpBase constructor.
+
+        :param pool_size: The maximum number of keep-alive connections per host.
+        """
+        self.pool_size = pool_size
+
+    def validate_url(self, url):
+        """
+        Validates the URL.
+
+        :param url: The URL to validate.
+        :raises: Exception if the URL is invalid.
+        """
+        if not url.startswith("http://") and not url.startswith("https://"):
+            self.log_error(f"Invalid URL: {url}")
+            raise Exception(f"Invalid URL: {url}")
+
+    def validate_payload(self, data):
+        """
+        Validates the payload for a PUT request.
+
+        :param data: The data to validate.
+        :raises: Exception if the payload is not bytes or is empty.
+        """
+        if not isinstance(data, bytes) or not data:
+            self.log_error(f"Invalid payload for PUT request: {data}")
+            raise Exception("Invalid payload: Data must be non-empty bytes.")
+
+    def log_error(self, message):
+        """
+        Logs an error message through the module logger.
+
+        :param message: The error message to log.
+        """
+        logger.error(message)
+
+class Http(HttpBase):
+    def __init__(self, pool_size=8):
+        """
+        Http constructor.
+        The underlying ClientSession is created lazily on first use so that it
+        is bound to the running event loop and reused across requests.
+
+        :param pool_size: The maximum number of keep-alive connections per host.
+        """
+        super().__init__(pool_size)
+        self._session: aiohttp.ClientSession | None = None
+        self._session_lock = asyncio.Lock()
+
+    async def _get_session(self):
+        """
+        Returns the shared ClientSession, creating it on first use.
+
+        :return: The aiohttp ClientSession.
+        """
+        async with self._session_lock:
+            if self._session is None or self._session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit_per_host=self.pool_size,
+                    keepalive_timeout=75,
+                    enable_cleanup_closed=True
+                )
+                self._session = aiohttp.ClientSession(connector=connector)
+            return self._session
+
+    async def close(self):
+        """
+        Closes the shared ClientSession and its connection pool.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 
     async def get(self, url):
         """
@@ -18,14 +102,14 @@ class Http:
         self.validate_url(url)
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    response.raise_for_status()
-                    return await response.json()
+            session = await self._get_session()
+            async with session.get(url) as response:
+                response.raise_for_status()
+                return orjson.loads(await response.read())
         except aiohttp.ClientError as e:
             self.log_error(f"GET request failed for URL {url}: {str(e)}")
             raise Exception(f"GET request failed: {str(e)}")
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             self.log_error(f"Invalid JSON response for GET request to {url}: {str(e)}")
             raise Exception(f"Invalid JSON response: {str(e)}")
 
@@ -34,7 +118,7 @@ class Http:
         Sends an asynchronous HTTP PUT request to a given URL with a JSON payload.
 
         :param url: The URL to send the request to.
-        :param data: The data to send as JSON.
+        :param data: The JSON payload, already serialized to bytes.
         :return: The response as a dictionary.
         :raises: Exception if the request fails or returns an invalid response.
         """
@@ -42,45 +126,87 @@ class Http:
         self.validate_payload(data)
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.put(url, json=data) as response:
-                    response.raise_for_status()
-                    return await response.json()
+            session = await self._get_session()
+            async with session.put(url, data=data, headers=self._JSON_HDR) as response:
+                response.raise_for_status()
+                return orjson.loads(await response.read())
         except aiohttp.ClientError as e:
             self.log_error(f"PUT request failed for URL {url}: {str(e)}")
             raise Exception(f"PUT request failed: {str(e)}")
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             self.log_error(f"Invalid JSON response for PUT request to {url}: {str(e)}")
             raise Exception(f"Invalid JSON response: {str(e)}")
 
-    def validate_url(self, url):
+class Http2(HttpBase):
+    """
+    HTTP handler backed by httpx with HTTP/2 enabled.
+    HTTP/2 is negotiated over TLS only, so this is meant for reaching the bridge
+    through an HTTP/2-capable HTTPS proxy (HUE_SCHEME=https); the bridge's local API speaks HTTP/1.1.
+    """
+
+    def __init__(self, pool_size=8):
         """
-        Validates the URL.
+        Http2 constructor.
 
-        :param url: The URL to validate.
-        :raises: Exception if the URL is invalid.
+        :param pool_size: The maximum number of keep-alive connections.
+        :raises: Exception if httpx is not installed.
         """
-        if not url.startswith("http://") and not url.startswith("https://"):
-            self.log_error(f"Invalid URL: {url}")
-            raise Exception(f"Invalid URL: {url}")
+        if httpx is None:
+            raise Exception("HTTP2=1 requires httpx: install it with pip install 'httpx[http2]'.")
 
-    def validate_payload(self, data):
+        super().__init__(pool_size)
+        self._client = httpx.AsyncClient(
+            http2=True,
+            timeout=5.0,
+            limits=httpx.Limits(max_connections=pool_size * 2, max_keepalive_connections=pool_size)
+        )
+
+    async def close(self):
         """
-        Validates the payload for a PUT request.
+        Closes the httpx client and its connection pool.
+        """
+        await self._client.aclose()
 
-        :param data: The data to validate.
-        :raises: Exception if the payload is not a dictionary or is empty.
+    async def get(self, url):
         """
-        if not isinstance(data, dict) or not data:
-            self.log_error(f"Invalid payload for PUT request: {data}")
-            raise Exception("Invalid payload: Data must be a non-empty dictionary.")
+        Sends an asynchronous HTTP GET request to a given URL.
 
-    def log_error(self, message):
+        :param url: The URL to send the request to.
+        :return: The response as a dictionary.
+        :raises: Exception if the request fails or returns an invalid response.
+        """
+        self.validate_url(url)
+
+        try:
+            response = await self._client.get(url)
+            response.raise_for_status()
+            return orjson.loads(response.content)
+        except httpx.HTTPError as e:
+            self.log_error(f"GET request failed for URL {url}: {str(e)}")
+            raise Exception(f"GET request failed: {str(e)}")
+        except orjson.JSONDecodeError as e:
+            self.log_error(f"Invalid JSON response for GET request to {url}: {str(e)}")
+            raise Exception(f"Invalid JSON response: {str(e)}")
+
+    async def put(self, url, data):
         """
-        Logs an error message to a file.
+        Sends an asynchronous HTTP PUT request to a given URL with a JSON payload.
 
-        :param message: The error message to log.
+        :param url: The URL to send the request to.
+        :param data: The JSON payload, already serialized to bytes.
+        :return: The response as a dictionary.
+        :raises: Exception if the request fails or returns an invalid response.
         """
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        with open(self.log_file, 'a') as log:
-            log.write(f"[{timestamp}] {message}\n")
\ No newline at end of file
+        self.validate_url(url)
+        self.validate_payload(data)
+
+        try:
+            response = await self._client.put(url, content=data, headers=self._JSON_HDR)
+            response.raise_for_status()
+            return orjson.loads(response.content)
+        except httpx.HTTPError as e:
+            self.log_error(f"PUT request failed for URL {url}: {str(e)}")
+            raise Exception(f"PUT request failed: {str(e)}")
+        except orjson.JSONDecodeError as e:
+            self.log_error(f"Invalid JSON response for PUT request to {url}: {str(e)}")
+            raise Exception(f"Invalid JSON response: {str(e)}")
\ No newline at end of file